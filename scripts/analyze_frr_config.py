@@ -6,11 +6,47 @@ This script analyzes FRR configurations and provides insights.
 GitHub Copilot can help extend this with additional analysis capabilities.
 """
 
+import array
 import re
 import sys
-from typing import Dict, List, Set
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from pathlib import Path
 
+from frr_config_io import iter_config_lines, read_config
+
+
+# Compiled patterns for configuration parsing
+_RE_ROUTE_MAP = re.compile(
+    r'^[ \t]*route-map[ \t]+(\S+)[ \t]+(permit|deny)[ \t]+(\d+)', re.MULTILINE
+)
+_RE_NETWORK = re.compile(r'^[ \t]*network[ \t]+([\d./]+)', re.MULTILINE)
+_RE_IP_ADDR = re.compile(r'ip\s+address\s+([\d./]+)')
+_RE_DESC = re.compile(r'description\s+(.+)')
+
+# Characters making up AS number and IPv4 neighbor address tokens; ASCII
+# only, since str.isdigit() also accepts digits int() rejects
+_ASN_CHARS = '0123456789'
+_IPV4_CHARS = '0123456789.'
+
+# Largest 4-byte AS number, which is also what peer_remote_as can hold
+_AS_MAX = 0xFFFFFFFF
+
+# Best-practice checks in report order: a marker searched across the whole
+# BGP config, and the recommendation issued when it is missing
+_BP_CHECKS = (
+    (re.compile(r'bgp[ \t]+router-id'),
+     "⚠️  Consider configuring explicit BGP router-id"),
+    (re.compile(r'log-neighbor-changes'),
+     "⚠️  Enable 'bgp log-neighbor-changes' for better monitoring"),
+    (re.compile(r'maximum-prefix'),
+     "⚠️  Consider configuring maximum-prefix limits on peers"),
+    (re.compile(r'soft-reconfiguration'),
+     "⚠️  Consider enabling soft-reconfiguration for policy changes"),
+    (re.compile(r'bogon', re.IGNORECASE),
+     "⚠️  Implement bogon prefix filtering for security"),
+)
+
 
 class FRRConfigAnalyzer:
     """Analyzes FRR configuration files"""
@@ -18,226 +54,304 @@ class FRRConfigAnalyzer:
     def __init__(self, bgpd_conf: str = None, zebra_conf: str = None):
         self.bgpd_conf = bgpd_conf
         self.zebra_conf = zebra_conf
-        self.bgp_config: List[str] = []
-        self.zebra_config: List[str] = []
-
-    def load_configs(self) -> bool:
-        """Load configuration files"""
+        self.bgp_config: str = ''
+        self.zebra_config: str = ''
+        # BGP peers, stored column-wise and indexed through peer_idx
+        self.peer_ips: List[str] = []
+        self.peer_remote_as: array.array = array.array('I')
+        self.peer_is_ibgp: bytearray = bytearray()
+        self.peer_policies: List[List[str]] = []
+        self.peer_idx: Dict[str, int] = {}
+        # Peers whose remote-as is outside the 4-byte range keep their row
+        # with peer_as_valid cleared; the AS as written is kept by row index
+        self.peer_as_valid: bytearray = bytearray()
+        self.invalid_remote_as: Dict[int, int] = {}
+        self.load_error: Optional[str] = None
+
+    def load_configs(self, report_errors: bool = True) -> bool:
+        """Load configuration files
+        On failure the message is kept in load_error, and printed unless
+        report_errors is False.
+        """
         try:
             if self.bgpd_conf and Path(self.bgpd_conf).exists():
-                with open(self.bgpd_conf, 'r') as f:
-                    self.bgp_config = f.readlines()
+                self.bgp_config = read_config(self.bgpd_conf)
 
             if self.zebra_conf and Path(self.zebra_conf).exists():
-                with open(self.zebra_conf, 'r') as f:
-                    self.zebra_config = f.readlines()
+                self.zebra_config = read_config(self.zebra_conf)
 
             return True
         except Exception as e:
-            print(f"Error loading configurations: {e}")
+            self.load_error = f"Error loading configurations: {e}"
+            if report_errors:
+                print(self.load_error)
             return False
 
-    def analyze_bgp_peers(self) -> Dict:
-        """Analyze BGP peer configurations"""
-        peers = {}
+    def analyze_bgp_peers(self) -> int:
+        """Analyze BGP peer configurations into the peer_* columns
+        Peers with an out-of-range AS keep their row, marked in peer_as_valid.
+        Returns the number of peers found.
+        """
+        self.peer_ips = []
+        self.peer_remote_as = array.array('I')
+        self.peer_is_ibgp = bytearray()
+        self.peer_policies = []
+        self.peer_idx = {}
+        self.peer_as_valid = bytearray()
+        self.invalid_remote_as = {}
+
         current_as = None
+        # Reuse one string object per neighbor address
+        ip_cache: Dict[str, str] = {}
+
+        # Router and neighbor lines are fixed-layout, so they are parsed by
+        # splitting on whitespace rather than through the regex engine
+        for _, line in iter_config_lines(self.bgp_config):
+            if not line.startswith(('router', 'neighbor')):
+                continue
 
-        for line in self.bgp_config:
-            line = line.strip()
+            parts = line.split()
 
             # Get local AS
-            as_match = re.match(r'router\s+bgp\s+(\d+)', line)
-            if as_match:
-                current_as = as_match.group(1)
+            if parts[0] == 'router':
+                if len(parts) >= 3 and parts[1] == 'bgp' and not parts[2].strip(_ASN_CHARS):
+                    current_as = int(parts[2])
+                continue
 
-            # Get neighbor info
-            neighbor_match = re.match(r'neighbor\s+([\d.]+)\s+remote-as\s+(\d+)', line)
-            if neighbor_match:
-                neighbor_ip = neighbor_match.group(1)
-                remote_as = neighbor_match.group(2)
+            if (parts[0] != 'neighbor' or len(parts) < 4
+                    or parts[1].strip(_IPV4_CHARS)):
+                continue
 
-                peer_type = "iBGP" if remote_as == current_as else "eBGP"
+            neighbor_ip = ip_cache.setdefault(parts[1], parts[1])
+            keyword = parts[2]
 
-                peers[neighbor_ip] = {
-                    'remote_as': remote_as,
-                    'type': peer_type,
-                    'policies': []
-                }
+            # Get neighbor info
+            if keyword == 'remote-as' and not parts[3].strip(_ASN_CHARS):
+                remote_as = int(parts[3])
+                is_valid = remote_as <= _AS_MAX
+                is_ibgp = remote_as == current_as
+
+                idx = self.peer_idx.get(neighbor_ip)
+                if idx is None:
+                    idx = len(self.peer_ips)
+                    self.peer_idx[neighbor_ip] = idx
+                    self.peer_ips.append(neighbor_ip)
+                    self.peer_remote_as.append(0)
+                    self.peer_is_ibgp.append(is_ibgp)
+                    self.peer_policies.append([])
+                    self.peer_as_valid.append(is_valid)
+                else:
+                    # A repeated remote-as line redefines the peer
+                    self.peer_is_ibgp[idx] = is_ibgp
+                    self.peer_policies[idx] = []
+                    self.peer_as_valid[idx] = is_valid
+
+                if is_valid:
+                    self.peer_remote_as[idx] = remote_as
+                    self.invalid_remote_as.pop(idx, None)
+                else:
+                    self.peer_remote_as[idx] = 0
+                    self.invalid_remote_as[idx] = remote_as
 
             # Get policy info
-            policy_match = re.match(r'neighbor\s+([\d.]+)\s+route-map\s+(\S+)\s+(in|out)', line)
-            if policy_match:
-                neighbor_ip = policy_match.group(1)
-                route_map = policy_match.group(2)
-                direction = policy_match.group(3)
-
-                if neighbor_ip in peers:
-                    peers[neighbor_ip]['policies'].append(f"{route_map} ({direction})")
+            elif keyword == 'route-map' and len(parts) >= 5 and parts[4] in ('in', 'out'):
+                idx = self.peer_idx.get(neighbor_ip)
+                if idx is not None:
+                    self.peer_policies[idx].append(f"{parts[3]} ({parts[4]})")
 
-        return peers
+        return len(self.peer_ips)
 
     def analyze_route_maps(self) -> Dict:
         """Analyze route-map configurations"""
         route_maps = {}
 
-        for line in self.bgp_config:
-            line = line.strip()
+        # Whole-buffer scan: the regex engine walks the lines, not Python
+        for match in _RE_ROUTE_MAP.finditer(self.bgp_config):
+            name = match.group(1)
+            action = match.group(2)
+            seq = match.group(3)
 
-            match = re.match(r'route-map\s+(\S+)\s+(permit|deny)\s+(\d+)', line)
-            if match:
-                name = match.group(1)
-                action = match.group(2)
-                seq = match.group(3)
+            if name not in route_maps:
+                route_maps[name] = []
 
-                if name not in route_maps:
-                    route_maps[name] = []
-
-                route_maps[name].append(f"seq {seq}: {action}")
+            route_maps[name].append(f"seq {seq}: {action}")
 
         return route_maps
 
-    def analyze_networks(self) -> List[str]:
-        """Analyze advertised networks"""
-        networks = []
-
-        for line in self.bgp_config:
-            line = line.strip()
-
-            match = re.match(r'network\s+([\d./]+)', line)
-            if match:
-                networks.append(match.group(1))
+    def iter_networks(self) -> Iterator[str]:
+        """Yield advertised networks as they are found"""
+        for match in _RE_NETWORK.finditer(self.bgp_config):
+            yield match.group(1)
 
-        return networks
-
-    def analyze_interfaces(self) -> Dict:
-        """Analyze interface configurations"""
-        interfaces = {}
+    def iter_interfaces(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (name, info) for each interface once its block is complete"""
         current_interface = None
+        info = None
 
-        for line in self.zebra_config:
-            line = line.strip()
-
+        for _, line in iter_config_lines(self.zebra_config):
             # Match interface definition
-            if_match = re.match(r'interface\s+(\S+)', line)
-            if if_match:
-                current_interface = if_match.group(1)
-                interfaces[current_interface] = {
-                    'addresses': [],
-                    'description': None,
-                    'status': 'up'
-                }
+            if line.startswith('interface'):
+                parts = line.split()
+                if parts[0] == 'interface' and len(parts) >= 2:
+                    if current_interface:
+                        yield current_interface, info
+                    current_interface = parts[1]
+                    info = {
+                        'addresses': [],
+                        'description': None,
+                        'status': 'up'
+                    }
+                    continue
 
             if current_interface:
                 # Get IP address
-                ip_match = re.match(r'ip\s+address\s+([\d./]+)', line)
-                if ip_match:
-                    interfaces[current_interface]['addresses'].append(ip_match.group(1))
+                if line.startswith('ip'):
+                    ip_match = _RE_IP_ADDR.match(line)
+                    if ip_match:
+                        info['addresses'].append(ip_match.group(1))
 
                 # Get description
-                desc_match = re.match(r'description\s+(.+)', line)
-                if desc_match:
-                    interfaces[current_interface]['description'] = desc_match.group(1)
+                elif line.startswith('description'):
+                    desc_match = _RE_DESC.match(line)
+                    if desc_match:
+                        info['description'] = desc_match.group(1)
 
                 # Check shutdown status
-                if line == 'shutdown':
-                    interfaces[current_interface]['status'] = 'down'
+                elif line == 'shutdown':
+                    info['status'] = 'down'
 
-        return interfaces
+        if current_interface:
+            yield current_interface, info
 
     def check_best_practices(self) -> List[str]:
         """Check for BGP best practices"""
         recommendations = []
 
-        # Check for router-id
-        has_router_id = any(re.search(r'bgp\s+router-id', line) for line in self.bgp_config)
-        if not has_router_id:
-            recommendations.append("⚠️  Consider configuring explicit BGP router-id")
-
-        # Check for log-neighbor-changes
-        has_logging = any('log-neighbor-changes' in line for line in self.bgp_config)
-        if not has_logging:
-            recommendations.append("⚠️  Enable 'bgp log-neighbor-changes' for better monitoring")
-
-        # Check for maximum-prefix
-        has_max_prefix = any('maximum-prefix' in line for line in self.bgp_config)
-        if not has_max_prefix:
-            recommendations.append("⚠️  Consider configuring maximum-prefix limits on peers")
-
-        # Check for soft-reconfiguration
-        has_soft_reconfig = any('soft-reconfiguration' in line for line in self.bgp_config)
-        if not has_soft_reconfig:
-            recommendations.append("⚠️  Consider enabling soft-reconfiguration for policy changes")
-
-        # Check for bogon filtering
-        has_bogon = any('BOGON' in line.upper() for line in self.bgp_config)
-        if not has_bogon:
-            recommendations.append("⚠️  Implement bogon prefix filtering for security")
+        # One C-level scan of the config buffer per marker
+        for marker, recommendation in _BP_CHECKS:
+            if not marker.search(self.bgp_config):
+                recommendations.append(recommendation)
 
         return recommendations
 
-    def generate_report(self) -> None:
-        """Generate comprehensive analysis report"""
-        print("=" * 70)
-        print("FRR Configuration Analysis Report")
-        print("=" * 70)
-        print()
+    def format_report(self) -> str:
+        """Build the comprehensive analysis report as a single string"""
+        out: List[str] = []
+
+        out.append("=" * 70)
+        out.append("FRR Configuration Analysis Report")
+        out.append("=" * 70)
+        out.append('')
 
         # BGP Peers
-        peers = self.analyze_bgp_peers()
-        if peers:
-            print("BGP Peer Summary:")
-            print("-" * 70)
-            for ip, info in peers.items():
-                print(f"  Peer: {ip}")
-                print(f"    AS: {info['remote_as']} ({info['type']})")
-                if info['policies']:
-                    print(f"    Policies: {', '.join(info['policies'])}")
-                print()
+        if self.analyze_bgp_peers():
+            out.append("BGP Peer Summary:")
+            out.append("-" * 70)
+            for idx, (ip, remote_as, is_ibgp, policies, is_valid) in enumerate(zip(
+                self.peer_ips, self.peer_remote_as, self.peer_is_ibgp,
+                self.peer_policies, self.peer_as_valid
+            )):
+                out.append(f"  Peer: {ip}")
+                if is_valid:
+                    out.append(f"    AS: {remote_as} ({'iBGP' if is_ibgp else 'eBGP'})")
+                else:
+                    out.append(f"    AS: {self.invalid_remote_as[idx]} (invalid, exceeds {_AS_MAX})")
+                if policies:
+                    out.append(f"    Policies: {', '.join(policies)}")
+                out.append('')
 
         # Advertised Networks
-        networks = self.analyze_networks()
-        if networks:
-            print("Advertised Networks:")
-            print("-" * 70)
-            for net in networks:
-                print(f"  • {net}")
-            print()
+        found = False
+        for net in self.iter_networks():
+            if not found:
+                out.append("Advertised Networks:")
+                out.append("-" * 70)
+                found = True
+            out.append(f"  • {net}")
+        if found:
+            out.append('')
 
         # Route Maps
         route_maps = self.analyze_route_maps()
         if route_maps:
-            print("Route Maps:")
-            print("-" * 70)
+            out.append("Route Maps:")
+            out.append("-" * 70)
             for name, sequences in route_maps.items():
-                print(f"  {name}:")
+                out.append(f"  {name}:")
                 for seq in sequences:
-                    print(f"    {seq}")
-            print()
+                    out.append(f"    {seq}")
+            out.append('')
 
         # Interfaces
-        interfaces = self.analyze_interfaces()
-        if interfaces:
-            print("Interface Summary:")
-            print("-" * 70)
-            for name, info in interfaces.items():
-                status_icon = "✅" if info['status'] == 'up' else "❌"
-                print(f"  {status_icon} {name}")
-                if info['description']:
-                    print(f"      Description: {info['description']}")
-                for addr in info['addresses']:
-                    print(f"      IP: {addr}")
-                print()
+        found = False
+        for name, info in self.iter_interfaces():
+            if not found:
+                out.append("Interface Summary:")
+                out.append("-" * 70)
+                found = True
+            status_icon = "✅" if info['status'] == 'up' else "❌"
+            out.append(f"  {status_icon} {name}")
+            if info['description']:
+                out.append(f"      Description: {info['description']}")
+            for addr in info['addresses']:
+                out.append(f"      IP: {addr}")
+            out.append('')
 
         # Best Practices
         recommendations = self.check_best_practices()
         if recommendations:
-            print("Best Practice Recommendations:")
-            print("-" * 70)
+            out.append("Best Practice Recommendations:")
+            out.append("-" * 70)
             for rec in recommendations:
-                print(f"  {rec}")
-            print()
+                out.append(f"  {rec}")
+            out.append('')
 
-        print("=" * 70)
+        out.append("=" * 70)
+
+        return '\n'.join(out) + '\n'
+
+    def generate_report(self) -> None:
+        """Generate comprehensive analysis report"""
+        sys.stdout.write(self.format_report())
+
+
+def _find_config_pairs(config_dir: str) -> List[Tuple[str, Optional[str]]]:
+    """Find every bgpd.conf below a directory, paired with a sibling zebra.conf"""
+    pairs = []
+    for bgpd in sorted(Path(config_dir).rglob('bgpd.conf')):
+        zebra = bgpd.with_name('zebra.conf')
+        pairs.append((str(bgpd), str(zebra) if zebra.exists() else None))
+    return pairs
+
+
+def _analyze_pair(pair: Tuple[str, Optional[str]]) -> Tuple[bool, str]:
+    """Analyze one bgpd/zebra pair and return the report (batch worker)
+    Errors are returned in the report text rather than raised or printed, so
+    one bad config cannot abort the batch or interleave with other output.
+    """
+    try:
+        analyzer = FRRConfigAnalyzer(*pair)
+        if not analyzer.load_configs(report_errors=False):
+            return False, f"{analyzer.load_error}\nFailed to load configuration files\n"
+        return True, analyzer.format_report()
+    except Exception as e:
+        return False, f"Error analyzing configuration: {e}\n"
+
+
+def analyze_directory(config_dir: str) -> bool:
+    """Analyze every router config pair below a directory in parallel"""
+    pairs = _find_config_pairs(config_dir)
+    if not pairs:
+        print(f"No bgpd.conf found under {config_dir}")
+        return False
+
+    success = True
+    with ProcessPoolExecutor() as executor:
+        # map() yields results in input order, so reports stay sorted by path
+        for pair, (loaded, report) in zip(pairs, executor.map(_analyze_pair, pairs)):
+            sys.stdout.write(f"{pair[0]}:\n{report}\n")
+            success = success and loaded
+    return success
 
 
 def main():
@@ -251,10 +365,18 @@ def main():
     if len(sys.argv) > 2:
         zebra_conf = sys.argv[2]
 
-    if not bgpd_conf and not zebra_conf:
+    # Batch mode takes a single directory and no zebra.conf
+    is_batch = bool(bgpd_conf) and Path(bgpd_conf).is_dir()
+
+    if (not bgpd_conf and not zebra_conf) or (is_batch and zebra_conf):
         print("Usage: python analyze_frr_config.py <bgpd.conf> [zebra.conf]")
+        print("       python analyze_frr_config.py <config-dir>")
         sys.exit(1)
 
+    # Batch mode: analyze every router config found under a directory
+    if is_batch:
+        sys.exit(0 if analyze_directory(bgpd_conf) else 1)
+
     analyzer = FRRConfigAnalyzer(bgpd_conf, zebra_conf)
     if analyzer.load_configs():
         analyzer.generate_report()
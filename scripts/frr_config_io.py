@@ -0,0 +1,49 @@
+"""
+FRR Configuration Reader
+
+Shared file loading and line iteration for the FRR configuration scripts.
+"""
+
+import mmap
+import os
+from typing import Iterator, Tuple
+
+
+# Files at least this large are read through mmap
+MMAP_THRESHOLD = 64 * 1024
+
+
+def read_config(path: str) -> str:
+    """Read a configuration file, memory-mapping it when it is large
+    Line endings are translated to '\n' as text-mode open() would, since the
+    file is decoded from bytes.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            text = f.read().decode()
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                text = str(mm, 'utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def iter_config_lines(text: str) -> Iterator[Tuple[int, str]]:
+    """Yield (line number, stripped line) pairs without building a list
+    Blank lines and '!' comments are skipped here, once, for every consumer.
+    """
+    start = 0
+    line_num = 0
+    length = len(text)
+    while start < length:
+        end = text.find('\n', start)
+        if end == -1:
+            end = length
+        line_num += 1
+        line = text[start:end].strip()
+        start = end + 1
+        if line and not line.startswith('!'):
+            yield line_num, line
@@ -6,29 +6,85 @@ This script validates FRR BGP configuration files for common issues.
 GitHub Copilot can help extend this script with additional validation rules.
 """
 
+import hashlib
+import json
+import os
 import re
 import sys
-from typing import List, Dict, Tuple
+import tempfile
+from typing import List, Dict, Optional, Set, Tuple
 from pathlib import Path
 
+import frr_config_io
+from frr_config_io import iter_config_lines, read_config
+
+try:
+    # Optional: google-re2 matches the combined definition pattern with a DFA
+    import re2 as _re_dfa
+except ImportError:
+    _re_dfa = re
+
+
+# Unindented statements that start a new top-level block and so close the
+# router bgp section. FRR does not require the section body to be indented,
+# so other column-0 lines (bgp router-id, neighbor ...) stay inside it.
+_TOP_LEVEL_KEYWORDS = (
+    'router', 'route-map', 'ip', 'ipv6', 'line', 'interface', 'hostname',
+    'password', 'enable', 'log', 'access-list', 'vrf', 'end',
+)
+
+# Compiled patterns for configuration parsing
+# _RE_DEFINITION classifies definition lines across the whole config buffer;
+# [ \t] rather than \s keeps every match on a single line. A bare '!' or
+# 'exit' line, or an unindented top-level keyword, closes the current
+# section; '!' comment lines do not.
+_RE_DEFINITION = _re_dfa.compile(
+    r'(?m)^(?:(?P<section_end>(?:!|exit)[ \t\r]*$)|[ \t]*(?:'
+    r'(?P<router_bgp>router[ \t]+bgp[ \t]+\d+)'
+    r'|(?P<router_id>bgp[ \t]+router-id)'
+    r'|neighbor[ \t]+(?P<neighbor>[\d.]+)[ \t]+'
+    r'(?P<attr>remote-as[ \t]+(?P<remote_as>\d+)|description[ \t]+.+|activate'
+    r'|soft-reconfiguration[ \t]+inbound)'
+    r'|route-map[ \t]+(?P<route_map>\S+)[ \t]+(?:permit|deny)[ \t]+\d+'
+    r'|ip[ \t]+prefix-list[ \t]+(?P<prefix_list>\S+)[ \t]+seq[ \t]+\d+'
+    r')|(?P<top_level>(?:' + '|'.join(_TOP_LEVEL_KEYWORDS) + r')(?:[ \t\r]|$)))'
+)
+
+# Match kinds that end the router bgp section
+_SECTION_CLOSERS = frozenset(('section_end', 'top_level', 'route_map', 'prefix_list'))
+
+_RE_ROUTE_MAP_REF = re.compile(r'route-map\s+(\S+)\s+(in|out)')
+_RE_PREFIX_LIST_REF = re.compile(r'match\s+ip\s+address\s+prefix-list\s+(\S+)')
+_RE_BOGON = re.compile(r'bogon', re.IGNORECASE)
+
+# Neighbor attribute keyword -> flag set in the neighbor record
+_NEIGHBOR_FLAGS = {
+    'description': 'has_description',
+    'activate': 'activated',
+    'soft-reconfiguration': 'soft_reconfig',
+}
+
 
 class BGPConfigValidator:
     """Validates BGP configuration files"""
 
-    def __init__(self, config_file: str):
+    def __init__(self, config_file: str, use_cache: bool = False):
         self.config_file = config_file
+        self.use_cache = use_cache
         self.errors: List[str] = []
         self.warnings: List[str] = []
-        self.config_lines: List[str] = []
+        self.config_text: str = ''
         self.neighbors: Dict[str, Dict] = {}
-        self.route_maps: Dict[str, bool] = {}
-        self.prefix_lists: Dict[str, bool] = {}
+        self.route_maps: Set[str] = set()
+        self.prefix_lists: Set[str] = set()
+        self.router_bgp_found = False
+        self.has_bogon_filter = False
+        self.has_router_id = False
 
     def load_config(self) -> bool:
         """Load configuration file"""
         try:
-            with open(self.config_file, 'r') as f:
-                self.config_lines = f.readlines()
+            self.config_text = read_config(self.config_file)
             return True
         except FileNotFoundError:
             self.errors.append(f"Configuration file not found: {self.config_file}")
@@ -37,74 +93,66 @@ class BGPConfigValidator:
             self.errors.append(f"Error reading configuration: {e}")
             return False
 
-    def validate_basic_syntax(self) -> None:
-        """Validate basic configuration syntax"""
-        router_bgp_found = False
+    def _scan_definitions(self) -> None:
+        """Extract router bgp, neighbor, route-map and prefix-list definitions
+        in a single pass, along with the bogon marker and whether the router bgp
+        section sets a router-id.
+        Note: Currently only matches IPv4 addresses. IPv6 and hostname-based neighbors not yet supported.
+        """
+        text = self.config_text
+        self.has_bogon_filter = _RE_BOGON.search(text) is not None
+
+        # Only definition lines reach Python; line numbers are recovered by
+        # counting newlines between consecutive matches.
+        line_num = 1
+        pos = 0
+        ip_cache: Dict[str, str] = {}
         in_router_bgp = False
+        for match in _RE_DEFINITION.finditer(text):
+            line_num += text.count('\n', pos, match.start())
+            pos = match.start()
+
+            # A section terminator or another top-level block ends the
+            # section; router bgp reopens it
+            kind = match.lastgroup
+            if kind in _SECTION_CLOSERS:
+                in_router_bgp = False
 
-        for line_num, line in enumerate(self.config_lines, 1):
-            line = line.strip()
-
-            # Skip comments and empty lines
-            if line.startswith('!') or not line:
-                continue
-
-            # Check for router bgp section
-            if re.match(r'^router\s+bgp\s+\d+', line):
-                router_bgp_found = True
+            if kind == 'router_bgp':
+                self.router_bgp_found = True
                 in_router_bgp = True
+            elif kind == 'router_id':
+                if in_router_bgp:
+                    self.has_router_id = True
+            elif kind == 'attr':
+                # Neighbor configuration (IPv4 only)
+                # TODO: Add support for IPv6 addresses and hostnames
+                # Reuse one string object per neighbor address
+                neighbor_ip = match.group('neighbor')
+                neighbor_ip = ip_cache.setdefault(neighbor_ip, neighbor_ip)
+                keyword = match.group('attr').split(None, 1)[0]
+
+                if keyword == 'remote-as':
+                    if neighbor_ip not in self.neighbors:
+                        self.neighbors[neighbor_ip] = {
+                            'remote_as': match.group('remote_as'),
+                            'line': line_num,
+                            'activated': False,
+                            'has_description': False,
+                            'soft_reconfig': False
+                        }
+                elif neighbor_ip in self.neighbors:
+                    self.neighbors[neighbor_ip][_NEIGHBOR_FLAGS[keyword]] = True
+            elif kind == 'route_map':
+                self.route_maps.add(match.group('route_map'))
+            elif kind == 'prefix_list':
+                self.prefix_lists.add(match.group('prefix_list'))
 
-            # Check for exit from router bgp
-            if in_router_bgp and line == '!':
-                in_router_bgp = False
-
-        if not router_bgp_found:
+    def validate_basic_syntax(self) -> None:
+        """Validate basic configuration syntax"""
+        if not self.router_bgp_found:
             self.errors.append("No 'router bgp' configuration found")
 
-    def extract_neighbors(self) -> None:
-        """Extract neighbor configurations
-        Note: Currently only matches IPv4 addresses. IPv6 and hostname-based neighbors not yet supported.
-        """
-        for line_num, line in enumerate(self.config_lines, 1):
-            line = line.strip()
-
-            # Match neighbor configuration (IPv4 only)
-            # TODO: Add support for IPv6 addresses and hostnames
-            neighbor_match = re.match(r'neighbor\s+([\d.]+)\s+remote-as\s+(\d+)', line)
-            if neighbor_match:
-                neighbor_ip = neighbor_match.group(1)
-                remote_as = neighbor_match.group(2)
-
-                if neighbor_ip not in self.neighbors:
-                    self.neighbors[neighbor_ip] = {
-                        'remote_as': remote_as,
-                        'line': line_num,
-                        'activated': False,
-                        'has_description': False,
-                        'soft_reconfig': False
-                    }
-
-            # Check for description
-            desc_match = re.match(r'neighbor\s+([\d.]+)\s+description\s+(.+)', line)
-            if desc_match:
-                neighbor_ip = desc_match.group(1)
-                if neighbor_ip in self.neighbors:
-                    self.neighbors[neighbor_ip]['has_description'] = True
-
-            # Check for activation
-            activate_match = re.match(r'neighbor\s+([\d.]+)\s+activate', line)
-            if activate_match:
-                neighbor_ip = activate_match.group(1)
-                if neighbor_ip in self.neighbors:
-                    self.neighbors[neighbor_ip]['activated'] = True
-
-            # Check for soft-reconfiguration
-            soft_match = re.match(r'neighbor\s+([\d.]+)\s+soft-reconfiguration\s+inbound', line)
-            if soft_match:
-                neighbor_ip = soft_match.group(1)
-                if neighbor_ip in self.neighbors:
-                    self.neighbors[neighbor_ip]['soft_reconfig'] = True
-
     def validate_neighbors(self) -> None:
         """Validate neighbor configurations"""
         for neighbor_ip, config in self.neighbors.items():
@@ -126,31 +174,13 @@ class BGPConfigValidator:
                     f"Neighbor {neighbor_ip} at line {config['line']} does not have soft-reconfiguration enabled"
                 )
 
-    def extract_route_maps(self) -> None:
-        """Extract route-map definitions"""
-        for line in self.config_lines:
-            line = line.strip()
-            match = re.match(r'route-map\s+(\S+)\s+(permit|deny)\s+\d+', line)
-            if match:
-                route_map_name = match.group(1)
-                self.route_maps[route_map_name] = True
-
-    def extract_prefix_lists(self) -> None:
-        """Extract prefix-list definitions"""
-        for line in self.config_lines:
-            line = line.strip()
-            match = re.match(r'ip\s+prefix-list\s+(\S+)\s+seq\s+\d+', line)
-            if match:
-                prefix_list_name = match.group(1)
-                self.prefix_lists[prefix_list_name] = True
-
     def validate_references(self) -> None:
-        """Validate that referenced route-maps and prefix-lists exist"""
-        for line_num, line in enumerate(self.config_lines, 1):
-            line = line.strip()
-
+        """Validate that referenced route-maps and prefix-lists exist
+        Runs as a second pass so that all definitions are known up front.
+        """
+        for line_num, line in iter_config_lines(self.config_text):
             # Check route-map references
-            route_map_ref = re.search(r'route-map\s+(\S+)\s+(in|out)', line)
+            route_map_ref = 'route-map' in line and _RE_ROUTE_MAP_REF.search(line)
             if route_map_ref:
                 route_map_name = route_map_ref.group(1)
                 if route_map_name not in self.route_maps:
@@ -159,7 +189,7 @@ class BGPConfigValidator:
                     )
 
             # Check prefix-list references in route-maps
-            prefix_list_ref = re.search(r'match\s+ip\s+address\s+prefix-list\s+(\S+)', line)
+            prefix_list_ref = 'prefix-list' in line and _RE_PREFIX_LIST_REF.search(line)
             if prefix_list_ref:
                 prefix_list_name = prefix_list_ref.group(1)
                 if prefix_list_name not in self.prefix_lists:
@@ -172,73 +202,150 @@ class BGPConfigValidator:
         Note: This is a basic check that only verifies the presence of bogon-related configuration.
         It does not validate that the filters are correctly defined or properly applied.
         """
-        has_bogon_filter = any('BOGON' in line.upper() for line in self.config_lines)
-        if not has_bogon_filter:
+        if not self.has_bogon_filter:
             self.warnings.append(
                 "No bogon filtering detected. Consider adding prefix-list for bogon networks"
             )
 
     def validate_router_id(self) -> None:
-        """Check if router-id is configured"""
-        has_router_id = any(re.search(r'bgp\s+router-id', line) for line in self.config_lines)
-        if not has_router_id:
+        """Check if router-id is configured in the router bgp section"""
+        if not self.has_router_id:
             self.errors.append("No BGP router-id configured")
 
+    def _cache_entry(self) -> Optional[Tuple[Path, List]]:
+        """Return the cache file for the loaded config and the key it must match
+        The key is a digest of the config contents, so copies that preserve
+        mtime and size (cp -p, rsync -a, tar) can never hit a stale entry.
+        """
+        try:
+            path = Path(self.config_file).resolve()
+            # Include the code the results depend on (this script, the shared
+            # reader and the regex engine) so they never outlive a code change
+            key = [
+                hashlib.sha256(self.config_text.encode()).hexdigest(),
+                Path(__file__).stat().st_mtime_ns,
+                Path(frr_config_io.__file__).stat().st_mtime_ns,
+                _re_dfa.__name__,
+            ]
+            cache_dir = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache')
+        except (OSError, RuntimeError):
+            return None
+        name = hashlib.sha1(str(path).encode()).hexdigest() + '.json'
+        return cache_dir / 'bgp_validate' / name, key
+
+    def _load_cached_results(self, cache_file: Path, key: List) -> bool:
+        """Restore errors and warnings from the cache if the config is unchanged"""
+        try:
+            with open(cache_file) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(cached, dict) or cached.get('key') != key:
+            return False
+        try:
+            errors = cached['errors']
+            warnings = cached['warnings']
+        except KeyError:
+            return False
+        if not isinstance(errors, list) or not isinstance(warnings, list):
+            return False
+        self.errors = errors
+        self.warnings = warnings
+        return True
+
+    def _store_cached_results(self, cache_file: Path, key: List) -> None:
+        """Save errors and warnings; a cache that cannot be written is skipped"""
+        tmp_name = None
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # A private temporary file per run, so concurrent runs never share one
+            with tempfile.NamedTemporaryFile(
+                'w', dir=str(cache_file.parent), suffix='.tmp', delete=False
+            ) as f:
+                tmp_name = f.name
+                json.dump({'key': key, 'errors': self.errors, 'warnings': self.warnings}, f)
+            os.replace(tmp_name, str(cache_file))
+        except OSError:
+            if tmp_name:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+
     def run_all_validations(self) -> Tuple[bool, List[str], List[str]]:
         """Run all validation checks"""
         if not self.load_config():
             return False, self.errors, self.warnings
 
+        # Key on the contents just read so a concurrent edit cannot be cached as clean
+        cache = self._cache_entry() if self.use_cache else None
+        if cache and self._load_cached_results(*cache):
+            return len(self.errors) == 0, self.errors, self.warnings
+
+        self._scan_definitions()
         self.validate_basic_syntax()
-        self.extract_neighbors()
         self.validate_neighbors()
-        self.extract_route_maps()
-        self.extract_prefix_lists()
         self.validate_references()
         self.validate_bogon_filters()
         self.validate_router_id()
 
+        if cache:
+            self._store_cached_results(*cache)
+
         return len(self.errors) == 0, self.errors, self.warnings
 
-    def print_report(self) -> None:
-        """Print validation report"""
-        print("=" * 70)
-        print(f"BGP Configuration Validation Report: {self.config_file}")
-        print("=" * 70)
-        print()
+    def format_report(self) -> str:
+        """Build the validation report as a single string"""
+        out: List[str] = []
+
+        out.append("=" * 70)
+        out.append(f"BGP Configuration Validation Report: {self.config_file}")
+        out.append("=" * 70)
+        out.append('')
 
         if self.errors:
-            print("ERRORS:")
+            out.append("ERRORS:")
             for error in self.errors:
-                print(f"  ❌ {error}")
-            print()
+                out.append(f"  ❌ {error}")
+            out.append('')
 
         if self.warnings:
-            print("WARNINGS:")
+            out.append("WARNINGS:")
             for warning in self.warnings:
-                print(f"  ⚠️  {warning}")
-            print()
+                out.append(f"  ⚠️  {warning}")
+            out.append('')
 
         if not self.errors and not self.warnings:
-            print("✅ Configuration validation passed with no issues!")
+            out.append("✅ Configuration validation passed with no issues!")
         elif not self.errors:
-            print("✅ Configuration validation passed with warnings")
+            out.append("✅ Configuration validation passed with warnings")
         else:
-            print("❌ Configuration validation failed")
+            out.append("❌ Configuration validation failed")
 
-        print()
-        print(f"Summary: {len(self.errors)} errors, {len(self.warnings)} warnings")
-        print("=" * 70)
+        out.append('')
+        out.append(f"Summary: {len(self.errors)} errors, {len(self.warnings)} warnings")
+        out.append("=" * 70)
+
+        return '\n'.join(out) + '\n'
+
+    def print_report(self) -> None:
+        """Print validation report"""
+        sys.stdout.write(self.format_report())
 
 
 def main():
     """Main function"""
-    if len(sys.argv) < 2:
-        print("Usage: python validate_bgp_config.py <bgpd.conf>")
+    args = sys.argv[1:]
+    use_cache = '--cache' in args
+    if use_cache:
+        args.remove('--cache')
+
+    if len(args) != 1:
+        print("Usage: python validate_bgp_config.py [--cache] <bgpd.conf>")
         sys.exit(1)
 
-    config_file = sys.argv[1]
-    validator = BGPConfigValidator(config_file)
+    config_file = args[0]
+    validator = BGPConfigValidator(config_file, use_cache=use_cache)
     success, errors, warnings = validator.run_all_validations()
     validator.print_report()
 
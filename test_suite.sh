@@ -83,6 +83,33 @@ echo ""
 cat /tmp/test-bgpd.conf
 echo ""
 
+# Test 8: Column-0 comments inside router bgp must not end the section
+echo -e "${GREEN}Test 8: Validating router-id after a column-0 comment${NC}"
+cat > /tmp/test-comment-bgpd.conf << 'EOF'
+router bgp 65001
+! Comment at column 0 inside the router bgp section
+ bgp router-id 10.0.0.1
+ neighbor 10.0.1.2 remote-as 65002
+!
+EOF
+echo "Command: python3 scripts/validate_bgp_config.py /tmp/test-comment-bgpd.conf"
+echo ""
+python3 scripts/validate_bgp_config.py /tmp/test-comment-bgpd.conf
+echo ""
+
+# Test 9: An unindented router bgp body stays inside the section
+echo -e "${GREEN}Test 9: Validating router-id in an unindented router bgp body${NC}"
+cat > /tmp/test-noindent-bgpd.conf << 'EOF'
+router bgp 65001
+bgp router-id 10.0.0.1
+neighbor 10.0.1.2 remote-as 65002
+!
+EOF
+echo "Command: python3 scripts/validate_bgp_config.py /tmp/test-noindent-bgpd.conf"
+echo ""
+python3 scripts/validate_bgp_config.py /tmp/test-noindent-bgpd.conf
+echo ""
+
 # Summary
 echo -e "${BLUE}========================================${NC}"
 echo -e "${BLUE}Test Suite Summary${NC}"
@@ -98,6 +125,8 @@ echo "  4. ✓ Issue detection"
 echo "  5. ✓ Automated fixing"
 echo "  6. ✓ Post-fix validation"
 echo "  7. ✓ Configuration review"
+echo "  8. ✓ Router-id detection after comment lines"
+echo "  9. ✓ Router-id detection in unindented sections"
 echo ""
 echo -e "${YELLOW}Note:${NC} Test configuration and backups are in /tmp/"
 echo ""